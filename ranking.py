@@ -3,11 +3,19 @@
 
 import sys
 import os
+import re
+import math
 import datetime
 import argparse
+from collections import defaultdict
 
 import matplotlib.pyplot as plt
 import numpy as np
+try:
+    from numba import njit, prange
+except ImportError:             # numba is optional, numpy is used without it
+    njit = None
+    prange = range
 
 NAMEFILE = "names.txt"
 GAMESFILE = "games.txt"
@@ -33,17 +41,29 @@ PENALTY_CUTOFF = STARTING_ELO * 0.75
                                 # below this, you don't get penalty
 BONUS = 0                       # bonus for playing per period
 
+DPI = 200                       # resolution of the ratings plot
+DRAFT_DPI = 72                  # resolution with cmd argument --draft
+PARALLEL_GAMES = 10000          # games per period from which numba computes
+                                # them in parallel threads
+
 #############################################################################
 
 GLICKO_C = np.sqrt((STARTING_RD ** 2 - APPROX_RD ** 2) / UNCERT_TIME)
-GLICKO_Q = np.log(10)/ELO_DIFF
+GLICKO_Q = math.log(10)/ELO_DIFF
+                                # 10 ** (x / ELO_DIFF) = exp(GLICKO_Q * x)
+GLICKO_G = 3 * GLICKO_Q ** 2 / math.pi ** 2
+                                # g(RD) = 1 / sqrt(1 + GLICKO_G * RD**2)
+DATE_RE = re.compile(r"(\d{4})(\d{2})(\d{2})\s*(#.*)?$")
+GAME_RE = re.compile(r"\s*(\S+)\s+(\S+)\s+(\S+)\s+(\S+)\s*$")
 __dates__ = []                  # list of playing dates for determining RD
+__date_idx__ = {}               # period index of each date in __dates__
 
 def main():
     # pylint: disable=global-statement
     """main stuff"""
     global GLICKO
-    GLICKO = parse_args(sys.argv[1:])
+    args = parse_args(sys.argv[1:])
+    GLICKO = args.glicko
     print(GLICKO)
     names = read_playernames(NAMEFILE)
     players = []
@@ -54,11 +74,16 @@ def main():
     league = League(players)
     Game.league = league
     games = read_gamestxt(GAMESFILE)
+    league.reserve(len(__dates__))
+    games_by_date = defaultdict(list)
+    for game in games:
+        games_by_date[game.date].append(game)
     whitewin = 0
     blackwin = 0
     remis = 0
+    out = []                    # output lines, written at the end
     for gameday, date in enumerate(__dates__):
-        period_games = [game for game in games if game.date == date]
+        period_games = games_by_date[date]
         for game in period_games:
             game.play()
             if game.winner_id == 0:
@@ -67,59 +92,61 @@ def main():
                 blackwin += 1
             else:
                 remis += 1
-        for player in league.players:
-            player.calculate_period(date)
-        for player in league.players:
-            player.apply_period()
-        print("\n" + "-"*51)
+        league.update_period(date, period_games)
+        if args.quiet:
+            continue
+        out.append("\n" + "-"*51)
         datestring = date.strftime("%A, %d. %B %Y:")
-        print("  Day {}, {:30} {} games\n"
-              "".format(gameday, datestring, len(period_games)))
+        out.append("  Day {}, {:30} {} games\n"
+                   "".format(gameday, datestring, len(period_games)))
         if GLICKO:
-            print("{:^12} {:>12} {:>12} {:>12}"
-                  "".format("Player", "Elo", "RD", "Days"))
+            out.append("{:^12} {:>12} {:>12} {:>12}"
+                       "".format("Player", "Elo", "RD", "Days"))
         else:
-            print("{:^16} {:>12}     {:>16}"
-                  "".format("Player", "Elo", "Days"))
-        print("-"*51)
-        league.show_table()
-        print("-"*51)
+            out.append("{:^16} {:>12}     {:>16}"
+                       "".format("Player", "Elo", "Days"))
+        out.append("-"*51)
+        out.extend(league.table())
+        out.append("-"*51)
 
     total = blackwin + whitewin + remis
-    print("-"*51)
-    print("{:.2f}% white winning \n{:.2f}% black winning \n{:.2f}% remis in\n"
-          "{:d} games"
-          "".format(whitewin / total * 100, blackwin / total * 100,
-                    remis / total * 100, total))
-
-    sorted_players = sorted(league.players,
-                            key=lambda x: x.elo[-1],
-                            reverse=True)
-    for player in sorted_players:
-        plt.plot(player.elo,
-                 label=("{:.0f} ({:+.0f}): {}"
-                        "".format(player.elo[-1],
-                                  player.elo[-1] - player.elo[-2],
-                                  player.name)))
-
-    #plt.legend(loc='center left', bbox_to_anchor=(1, 0.5))
-    plt.legend()
-    plt.savefig("ratingsplot.png", bbox_inches="tight", dpi=200)
+    out.append("-"*51)
+    out.append("{:.2f}% white winning \n{:.2f}% black winning \n"
+               "{:.2f}% remis in\n{:d} games"
+               "".format(whitewin / total * 100, blackwin / total * 100,
+                         remis / total * 100, total))
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.stdout.flush()
+
+    elohist = league.elohist
+    order = np.argsort(-elohist[-1], kind="stable")
+    lines = plt.plot(elohist[:, order])
+    labels = ["{:.0f} ({:+.0f}): {}"
+              "".format(elohist[-1, idx],
+                        elohist[-1, idx] - elohist[-2, idx],
+                        league.players[idx].name)
+              for idx in order]
+
+    #plt.legend(lines, labels, loc='center left', bbox_to_anchor=(1, 0.5))
+    plt.legend(lines, labels)
+    plt.savefig("ratingsplot.png", bbox_inches="tight",
+                dpi=DRAFT_DPI if args.draft else DPI)
     # plt.show()
 
 
 def parse_args(arglist):
-    """Checks for command line argument GLICKO mode on or off."""
+    """Parses the command line arguments: GLICKO mode on or off, whether to
+    save the plot in draft resolution and whether to skip the tables."""
     parser = argparse.ArgumentParser(description="Schachtabelle")
     parser.add_argument("-g", "--glicko", action="store_true",
                         help="use glicko system")
     parser.add_argument("-p", "--plot", action="store_true",
                         help="plot results")
-    args = parser.parse_args(arglist)
-    for key, value in vars(args).items():
-        if key == "glicko":
-            return value
-    return False
+    parser.add_argument("-d", "--draft", action="store_true",
+                        help="save plot in low resolution")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="do not print the table of every game day")
+    return parser.parse_args(arglist)
 
 def read_gamestxt(fname):
     """read file with game results, format:
@@ -128,26 +155,29 @@ def read_gamestxt(fname):
     p1      p2      r1      r2
     ...
     winner_id: 0=white, 1=black, else=remis"""
-    games = []
+    results = []
+    dates = {}                  # date tuple -> datetime.date
     with open(fname) as file:
-        dates = []
         date = (1970, 1, 1)
         for line in file:
             if line[0] == "#":
                 continue
-            elif line[0] == "2":
-                date = (int(line[0:4]), int(line[4:6]), int(line[6:8]))
-            elif len(line.split()) == 4:
-                player1 = line.split()[0]
-                player2 = line.split()[1]
-                win2 = line.split()[3]
-                winner_id = float(win2)
-                game = Game(player1, player2, winner_id=winner_id, date=date)
-                games.append(game)
-                dates.append(datetime.date(*date))
-        __dates__.clear()
-        __dates__.extend(list(set(dates)))
-        __dates__.sort()
+            match = DATE_RE.match(line)
+            if match:
+                date = tuple(int(part) for part in match.group(1, 2, 3))
+                continue
+            match = GAME_RE.match(line)
+            if match:
+                player1, player2, _, win2 = match.groups()
+                if date not in dates:
+                    dates[date] = datetime.date(*date)
+                results.append((player1, player2, float(win2), dates[date]))
+    games = [Game(player1, player2, winner_id=winner_id, date=date)
+             for player1, player2, winner_id, date in results]
+    __dates__.clear()
+    __dates__.extend(sorted(dates.values()))
+    __date_idx__.clear()
+    __date_idx__.update({date: i for i, date in enumerate(__dates__)})
     return games
 
 
@@ -174,119 +204,193 @@ def read_playernames(fname):
     return names
 
 
-def periods(now, games):
-    """calculates game periods between two games, game2 being more recent"""
-    last_game_date = games[-1].date
-    for i, game in enumerate(games):
-        if __dates__.index(now) <= __dates__.index(game.date):
-            last_game_date = games[i-1].date
-    return __dates__.index(now) - __dates__.index(last_game_date)
+def periods(now, player):
+    """calculates game periods between now and the last game of player"""
+    return __date_idx__[now] - player.last_game_period
+
+
+def _numpy_period_sums(elo, g_weight, w_idx, b_idx, s_white):
+    """sums of the glicko d^2 and r components of every player over the
+    games of one period, given by the player indices of white and black and
+    the result of white; also returns which players have played"""
+    # every game counts once for white and once for black, interleaved
+    # to sum the components in the order the games were played
+    p_idx = np.column_stack((w_idx, b_idx)).ravel()
+    score = np.column_stack((s_white, 1 - s_white)).ravel()
+
+    # elo difference of each game is taken once and the expected results of
+    # both sides go through a single exp
+    elo_diff = elo[b_idx] - elo[w_idx]
+    g_white = g_weight[w_idx]
+    g_black = g_weight[b_idx]
+    g_other = np.column_stack((g_black, g_white)).ravel()
+    expected = 1 / (1 + np.exp(np.column_stack((g_black * elo_diff,
+                                                -g_white * elo_diff)).ravel()
+                               * GLICKO_Q))
+    d_sum = np.zeros_like(elo)
+    r_sum = np.zeros_like(elo)
+    np.add.at(d_sum, p_idx, g_other ** 2 * expected * (1 - expected))
+    np.add.at(r_sum, p_idx, g_other * (score - expected))
+    played = np.zeros(len(elo), dtype=np.bool_)
+    played[p_idx] = True
+    return d_sum, r_sum, played
+
+
+def _loop_period_sums(elo, g_weight, w_idx, b_idx, s_white):
+    """same as _numpy_period_sums, written as loops to be compiled by numba;
+    the components of each game are independent and may be computed in
+    parallel, adding them up per player is done in order"""
+    n_games = len(w_idx)
+    d_white = np.empty(n_games)
+    r_white = np.empty(n_games)
+    d_black = np.empty(n_games)
+    r_black = np.empty(n_games)
+    for i in prange(n_games):   # pylint: disable=not-an-iterable
+        white = w_idx[i]
+        black = b_idx[i]
+        elo_diff = elo[black] - elo[white]
+        e_white = 1 / (1 + math.exp(g_weight[black] * elo_diff * GLICKO_Q))
+        e_black = 1 / (1 + math.exp(-g_weight[white] * elo_diff * GLICKO_Q))
+        d_white[i] = g_weight[black] ** 2 * e_white * (1 - e_white)
+        r_white[i] = g_weight[black] * (s_white[i] - e_white)
+        d_black[i] = g_weight[white] ** 2 * e_black * (1 - e_black)
+        r_black[i] = g_weight[white] * (1 - s_white[i] - e_black)
+
+    d_sum = np.zeros_like(elo)
+    r_sum = np.zeros_like(elo)
+    played = np.zeros(len(elo), dtype=np.bool_)
+    for i in range(n_games):
+        white = w_idx[i]
+        black = b_idx[i]
+        d_sum[white] += d_white[i]
+        r_sum[white] += r_white[i]
+        d_sum[black] += d_black[i]
+        r_sum[black] += r_black[i]
+        played[white] = True
+        played[black] = True
+    return d_sum, r_sum, played
+
+
+if njit is None:
+    _serial_period_sums = _parallel_period_sums = _numpy_period_sums
+else:
+    _serial_period_sums = njit(cache=True, fastmath=True, nogil=True,
+                               boundscheck=False)(_loop_period_sums)
+    # not cached, numba would use the cache file of the serial version
+    _parallel_period_sums = njit(fastmath=True, nogil=True, boundscheck=False,
+                                 parallel=True)(_loop_period_sums)
+
+
+def period_sums(elo, g_weight, w_idx, b_idx, s_white):
+    """sums of the glicko d^2 and r components of every player over the
+    games of one period, see _numpy_period_sums; with numba, periods with at
+    least PARALLEL_GAMES games are computed in parallel threads"""
+    if len(w_idx) < PARALLEL_GAMES:
+        return _serial_period_sums(elo, g_weight, w_idx, b_idx, s_white)
+    return _parallel_period_sums(elo, g_weight, w_idx, b_idx, s_white)
 
 
 class Player:
-    """player class, identifiable by name"""
+    """player class, identifiable by name
+
+    elo and RD live in the arrays of the league the player belongs to, the
+    player itself only knows its index into them"""
+    # pylint: disable=protected-access
+    __slots__ = ("name", "fullname", "games", "_game_set", "k_factor",
+                 "league", "_idx", "_start", "_gamedays", "_last_gameday")
+
     def __init__(self, name, elo=STARTING_ELO, rdev=STARTING_RD):
         self.name = name
         self.fullname = self.name
         self.games = []
-        self.elo = [elo]
-        self.rdev = [rdev]
+        self._game_set = set()  # same games as self.games, for lookup
         self.k_factor = DEFAULT_K_FACTOR
-        self.buffer = [None, None]
-        # self.rdev_buffer = None
+        self.league = None
+        self._idx = None
+        self._start = (elo, rdev)
+        self._gamedays = 0
+        self._last_gameday = None
+
+    @property
+    def elo(self):
+        """current rating"""
+        return self.league._elo[self._idx]
+
+    @elo.setter
+    def elo(self, value):
+        self.league._elo[self._idx] = value
+
+    @property
+    def rdev(self):
+        """current rating deviation"""
+        return self.league._rdev[self._idx]
+
+    @rdev.setter
+    def rdev(self, value):
+        self.league._rdev[self._idx] = value
+
+    @property
+    def _g_cached(self):
+        """g(RD) as of the last applied period"""
+        return self.league._g[self._idx]
+
+    @property
+    def last_game_period(self):
+        """index of the most recent period the player has played in, -1 if
+        the player has not played yet"""
+        return self.league._last_game_period[self._idx]
+
+    @last_game_period.setter
+    def last_game_period(self, value):
+        self.league._last_game_period[self._idx] = value
+
+    @property
+    def elohist(self):
+        """ratings after every period, starting with the initial rating"""
+        return self.league.elohist[:, self._idx]
+
+    @property
+    def rdevhist(self):
+        """rating deviations after every period"""
+        return self.league.rdevhist[:, self._idx]
 
     def expected(self, other):
         """expected result against other player"""
-        ex_value = 1 / (1 + 10 ** (other.g_weight()
-                                   * (other.elo[-1] - self.elo[-1])
-                                   / ELO_DIFF))
+        ex_value = 1 / (1 + math.exp(other._g_cached
+                                     * (other.elo - self.elo)
+                                     * GLICKO_Q))
         return ex_value
 
     def g_weight(self):
         """calculate g(RD) from glicko method"""
         if not GLICKO:
             return 1
-        g_value = np.sqrt(1 + (3 * GLICKO_Q ** 2
-                               * self.rdev[-1] ** 2
-                               / np.pi ** 2)
-                         ) ** -1
+        g_value = 1 / math.sqrt(1 + GLICKO_G * self.rdev ** 2)
         return g_value
 
     def add_game(self, game):
         """adds game to history"""
-        if game not in self.games:
+        if game not in self._game_set:
+            self._game_set.add(game)
             self.games.append(game)
-
-    def calculate_period(self, now):
-        """calculates new RD"""
-        if not self.games:
-            self.buffer[1] = self.rdev[-1]
-            self.buffer[0] = (self.elo[-1]
-                              - max(self.elo[-1] - PENALTY_CUTOFF, 0)
-                              * PENALTY)
-        elif not self.games[-1].date == now:
-            non_played_periods = periods(now, self.games)
-            rdev = min(np.sqrt(self.rdev[-1] ** 2
-                               + GLICKO_C * non_played_periods),
-                       STARTING_RD)
-            if GLICKO:
-                self.buffer[1] = rdev
-            else:
-                self.buffer[1] = 0
-            self.buffer[0] = (self.elo[-1]
-                              - max(self.elo[-1] - PENALTY_CUTOFF, 0)
-                              * PENALTY
-                              * np.exp(EXP_PENALTY
-                                       * (non_played_periods - 1)))
-        else:
-            last_games = [game for game in self.games if game.date == now]
-            d_comps = []
-            r_comps = []
-            for game in last_games:
-                other = game.other_player(self)
-                expected = self.expected(other)
-                win_value = game.win_value(self)
-                d_comps.append(other.g_weight() ** 2
-                               * expected
-                               * (1 - expected))
-                r_comps.append(other.g_weight() * (win_value - expected))
-            d2_weight = (GLICKO_Q ** 2 * sum(d_comps)) ** -1
-            if GLICKO:
-                self.buffer[1] = max(np.sqrt(1 / self.rdev[-1] ** 2
-                                             + 1 / d2_weight
-                                            ) ** -1,
-                                     MIN_RD)
-                self.buffer[0] = (self.elo[-1]
-                                  + GLICKO_Q
-                                  * self.buffer[1] ** 2
-                                  * sum(r_comps)
-                                  + BONUS)
-            else:
-                self.buffer[1] = 0
-                self.buffer[0] = self.elo[-1] + sum(r_comps) * self.k_factor
-            # if self.name == "ME":
-            #     print(r_comps)
-            #     print(GLICKO_Q * self.rdev_buffer ** 2)
-            #     rdev_diff = self.rdev_buffer - self.rdev[-1]
-            #     elo_diff = self.elo_buffer - self.elo[-1]
-            #     print("{:^12}: elo {:+}, RD {:+}"
-            #           "".format(self.fullname, elo_diff, rdev_diff))
-
-    def apply_period(self):
-        """stores new rdev and elo"""
-        self.rdev.append(self.buffer[1])
-        self.elo.append(self.buffer[0])
+            self.last_game_period = max(self.last_game_period,
+                                        __date_idx__[game.date])
+            # games are played in chronological order
+            if game.date != self._last_gameday:
+                self._gamedays += 1
+                self._last_gameday = game.date
 
     def show_stats(self):
         """show a string for the league table"""
-        gamedays = len(set([game.date for game in self.games]))
-        elostring = " {:.0f} ({:+.0f})".format(self.elo[-1],
-                                               self.elo[-1] - self.elo[-2])
+        gamedays = self._gamedays
+        last_elo = self.elohist[-2]
+        elostring = " {:.0f} ({:+.0f})".format(self.elo,
+                                               self.elo - last_elo)
         if GLICKO:
             statstring = ("{:^12} {:12} {:>12.0f} {:>12d}"
                           "".format(self.fullname,
                                     elostring,
-                                    self.rdev[-1],
+                                    self.rdev,
                                     gamedays))
         else:
             statstring = ("{:^16}      {:16} {:>11d}"
@@ -298,6 +402,7 @@ class Player:
 
 class Game:
     """game class"""
+    __slots__ = ("white", "black", "winner_id", "date", "played")
     league = None
     def __init__(self, white_name, black_name, winner_id=None, date=None):
         if isinstance(white_name, str):
@@ -312,12 +417,18 @@ class Game:
         self.winner_id = winner_id
         if date is None:
             self.date = datetime.date.today()
+        elif isinstance(date, datetime.date):
+            self.date = date
         else:
             self.date = datetime.date(*date)
         self.played = False
 
     def play(self):
-        """adds this game to the players' history"""
+        """adds this game to the players' history, does nothing if the game
+        has been played already"""
+        if self.played:
+            return
+        self.played = True
         self.black.add_game(self)
         self.white.add_game(self)
 
@@ -341,40 +452,154 @@ class Game:
 
 
 class League:
-    """league class"""
+    """league class
+
+    holds elo and RD of all players as arrays indexed by player so that a
+    whole period can be calculated at once"""
+    # pylint: disable=protected-access
     def __init__(self, players):
-        namelist = [player.name for player in players]
-        if len(set(namelist)) < len(namelist):
-            raise TypeError("name taken doubly")
         self.players = players
         self.games = []
+        self._name_to_idx = {}
+        self._fullname_to_idx = {}
+        for idx, player in enumerate(players):
+            if player.name in self._name_to_idx:
+                raise TypeError("name taken doubly")
+            player.league = self
+            player._idx = idx
+            self._name_to_idx[player.name] = idx
+            self._fullname_to_idx.setdefault(player.fullname, idx)
+        # history of elo and RD with one row per period, preallocated by
+        # reserve; self._elo and self._rdev are views on the current row
+        self._period = 0
+        self._elo_hist = np.array([[player._start[0] for player in players]],
+                                  dtype=float)
+        self._rdev_hist = np.array([[player._start[1] for player in players]],
+                                   dtype=float)
+        self._elo = self._elo_hist[self._period]
+        self._rdev = self._rdev_hist[self._period]
+        self._last_game_period = np.full(len(players), -1, dtype=np.int32)
+        self._g = self.g_weights()
 
     def add_player(self, player):
         """add a player and tests if this player already exists"""
-        namelist = [player.name for player in self.players]
-        if player.name in namelist:
+        if player.name in self._name_to_idx:
             print("name {} already taken".format(player.name))
             return
+        player.league = self
+        player._idx = len(self.players)
+        self._name_to_idx[player.name] = player._idx
+        self._fullname_to_idx.setdefault(player.fullname, player._idx)
+        elo, rdev = player._start
+        self._elo_hist = np.column_stack(
+            (self._elo_hist, np.full(len(self._elo_hist), elo)))
+        self._rdev_hist = np.column_stack(
+            (self._rdev_hist, np.full(len(self._rdev_hist), rdev)))
+        self._elo = self._elo_hist[self._period]
+        self._rdev = self._rdev_hist[self._period]
+        self._last_game_period = np.append(self._last_game_period, -1)
+        self._g = self.g_weights()
         self.players.append(player)
 
     def get_player(self, name):
         """get player by name"""
-        for player in self.players:
-            if player.name == name or player.fullname == name:
-                return player
+        idx = self._name_to_idx.get(name, self._fullname_to_idx.get(name))
+        if idx is not None:
+            return self.players[idx]
         print("player {} not found".format(name))
 
     def add_game(self, game):
         """add a game to the league and also play it"""
         self.games.append(game)
 
+    @property
+    def elohist(self):
+        """ratings of all players after every period, one column per
+        player"""
+        return self._elo_hist[:self._period + 1]
+
+    @property
+    def rdevhist(self):
+        """rating deviations of all players after every period"""
+        return self._rdev_hist[:self._period + 1]
+
+    def reserve(self, n_periods):
+        """makes room in the history for n_periods more periods"""
+        missing = self._period + n_periods + 1 - len(self._elo_hist)
+        if missing <= 0:
+            return
+        n_players = len(self.players)
+        self._elo_hist = np.concatenate(
+            (self._elo_hist, np.empty((missing, n_players))))
+        self._rdev_hist = np.concatenate(
+            (self._rdev_hist, np.empty((missing, n_players))))
+        self._elo = self._elo_hist[self._period]
+        self._rdev = self._rdev_hist[self._period]
+
+    def g_weights(self):
+        """g(RD) from glicko method for all players, only depends on RD and
+        is therefore kept in self._g between periods"""
+        if not GLICKO:
+            return np.ones_like(self._rdev)
+        return 1 / np.sqrt(1 + GLICKO_G * self._rdev ** 2)
+
+    def update_period(self, now, games):
+        """calculates new elo and RD of all players from the games played on
+        date now; they are written straight into the next history row, which
+        becomes the current one"""
+        if self._period + 1 == len(self._elo_hist):
+            self.reserve(self._period + 1)
+        elo = self._elo
+        rdev = self._rdev
+        new_elo = self._elo_hist[self._period + 1]
+        new_rdev = self._rdev_hist[self._period + 1]
+        w_idx = np.array([game.white._idx for game in games], dtype=np.int32)
+        b_idx = np.array([game.black._idx for game in games], dtype=np.int32)
+        s_white = np.array([game.win_value(game.white) for game in games],
+                           dtype=float)
+        d_sum, r_sum, played = period_sums(elo, self._g,
+                                           w_idx, b_idx, s_white)
+        idle = ~played & (self._last_game_period >= 0)
+        non_played_periods = np.where(
+            idle, __date_idx__[now] - self._last_game_period, 1)
+
+        new_elo[:] = (elo
+                      - np.maximum(elo - PENALTY_CUTOFF, 0)
+                      * PENALTY
+                      * np.exp(EXP_PENALTY * (non_played_periods - 1)))
+        new_rdev[:] = rdev
+        if GLICKO:
+            new_rdev[idle] = np.minimum(np.sqrt(rdev[idle] ** 2
+                                                + GLICKO_C
+                                                * non_played_periods[idle]),
+                                        STARTING_RD)
+            new_rdev[played] = np.maximum(
+                1 / np.sqrt(1 / rdev[played] ** 2
+                            + GLICKO_Q ** 2 * d_sum[played]),
+                MIN_RD)
+            new_elo[played] = (elo[played]
+                               + GLICKO_Q
+                               * new_rdev[played] ** 2
+                               * r_sum[played]
+                               + BONUS)
+        else:
+            k_factor = np.array([player.k_factor for player in self.players])
+            new_rdev[idle | played] = 0
+            new_elo[played] = (elo[played]
+                               + r_sum[played] * k_factor[played])
+        self._period += 1
+        self._elo = new_elo
+        self._rdev = new_rdev
+        self._g = self.g_weights()
+
+    def table(self):
+        """lines of the ladder"""
+        order = np.argsort(-self._elo, kind="stable")
+        return [self.players[idx].show_stats() for idx in order]
+
     def show_table(self):
         """show the ladder"""
-        sorted_players = sorted(self.players,
-                                key=lambda x: x.elo[-1],
-                                reverse=True)
-        for player in sorted_players:
-            print(player.show_stats())
+        print("\n".join(self.table()))
 
 if __name__ == "__main__":
     main()